@@ -0,0 +1,246 @@
+# File:    <repo>/src/gvm/caches.py
+# Date:    2024-07-07
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+This `caches` sub module of the `gvm` package attributes the disk usage of the
+version specific subtrees of the Gradle user home to Gradle versions:
+
+    ~/.gradle/caches/<version>/
+    ~/.gradle/daemon/<version>/
+
+Subtrees of versions that are no longer installed are orphans, and can be
+pruned. A version is in use when a daemon of it is running, or when any of its
+subtrees holds a lock file that is locked by another process. None of the
+subtrees of a version in use are removed.
+"""
+
+import os
+import sys
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+import psutil
+
+from gvm import disk, version as gradle_version
+from reflect import runtime_os, user
+
+
+GRADLE_USER_HOME_ENV_VAR = "GRADLE_USER_HOME"
+
+# Sub directories of the Gradle user home that hold one dir per Gradle version
+VERSIONED_SUBTREES = [
+    "caches",
+    "daemon",
+]
+
+# Main class of a Gradle daemon, followed by its Gradle version on the cmdline
+GRADLE_DAEMON_MAIN_CLASS = "org.gradle.launcher.daemon.bootstrap.GradleDaemon"
+
+
+def get_gradle_user_home() -> Optional[str]:
+    """
+    Get the Gradle user home, from `GRADLE_USER_HOME` or `~/.gradle` of the
+    user gvm acts on behalf of (the `sudo` invoking user, if any).
+    """
+    gradle_user_home = os.environ.get(GRADLE_USER_HOME_ENV_VAR)
+    if gradle_user_home:
+        return gradle_user_home
+    home_dir = user.get_invoking_user_home_dir()
+    return os.path.join(home_dir, ".gradle") if home_dir else None
+
+
+def iter_version_dirs(gradle_user_home: str) -> Iterator[tuple[str, str, str]]:
+    """
+    Enumerate the version specific directories of a Gradle user home.
+
+    Yields:
+        tuple: The (subtree, version, path) of each version directory.
+    """
+    for subtree in VERSIONED_SUBTREES:
+        subtree_dir = os.path.join(gradle_user_home, subtree)
+        try:
+            names = os.listdir(subtree_dir)
+        except OSError:
+            continue
+        for name in names:
+            path = os.path.join(subtree_dir, name)
+            if gradle_version.is_version(name) and os.path.isdir(path) \
+                    and not os.path.islink(path):
+                yield subtree, name, path
+
+
+def get_running_daemon_versions() -> set[str]:
+    """Get the Gradle versions of all running Gradle daemons."""
+    versions = set()
+    for process in psutil.process_iter(["cmdline"]):
+        cmdline = process.info.get("cmdline") or []
+        try:
+            index = cmdline.index(GRADLE_DAEMON_MAIN_CLASS)
+            versions.add(cmdline[index + 1])
+        except (ValueError, IndexError):
+            continue
+    return versions
+
+
+def is_file_locked(path: str) -> bool:
+    """
+    Check if another process holds a lock on a file.
+
+    Gradle guards its caches with OS level file locks on `*.lock` files. On
+    POSIX, this tries (and immediately releases) a non-blocking exclusive lock.
+    Elsewhere, only files that cannot be opened for writing count as locked.
+    """
+    try:
+        with open(path, "r+b") as f:
+            if runtime_os.is_posix_compatible():
+                import fcntl
+                try:
+                    fcntl.lockf(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return True
+                fcntl.lockf(f.fileno(), fcntl.LOCK_UN)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return True
+    return False
+
+
+def is_dir_locked(path: str) -> bool:
+    """Check if any `*.lock` file below a directory is locked by another process."""
+    for dir_path, _, file_names in os.walk(path):
+        for file_name in file_names:
+            if file_name.endswith(".lock") and is_file_locked(
+                    os.path.join(dir_path, file_name)):
+                return True
+    return False
+
+
+def _analyze_version_dir(
+        subtree: str,
+        version: str,
+        path: str,
+        installed_versions: set[str],
+        daemon_versions: set[str]) -> dict:
+    orphan = version not in installed_versions
+    return {
+        "subtree": subtree,
+        "version": version,
+        "path": path,
+        "bytes": disk.get_dir_size(path),
+        "orphan": orphan,
+        "locked": version in daemon_versions or (orphan and is_dir_locked(path)),
+    }
+
+
+def analyze_caches(
+        installed_versions: set[str],
+        gradle_user_home: Optional[str] = None,
+        max_workers: Optional[int] = None) -> list[dict]:
+    """
+    Attribute the disk usage of the version specific subtrees to Gradle versions.
+
+    Each version directory is measured in parallel.
+
+    Args:
+        installed_versions (set): The Gradle versions that are installed.
+        gradle_user_home (str, optional): Defaults to `get_gradle_user_home()`.
+        max_workers (int, optional): Number of parallel walks.
+            Defaults to the number of CPUs.
+
+    Returns:
+        list: One record per version directory, with keys `subtree`, `version`,
+            `path`, `bytes`, `orphan` (version not installed) and `locked`
+            (any subtree of the version is in use by a daemon or another
+            process).
+    """
+    gradle_user_home = gradle_user_home or get_gradle_user_home()
+    if not gradle_user_home:
+        return []
+
+    daemon_versions = get_running_daemon_versions()
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+        futures = [
+            executor.submit(_analyze_version_dir, subtree, version, path,
+                            installed_versions, daemon_versions)
+            for subtree, version, path in iter_version_dirs(gradle_user_home)]
+        records = [future.result() for future in futures]
+
+    # A lock in one subtree of a version means the whole version is in use
+    locked_versions = {r["version"] for r in records if r["locked"]}
+    for record in records:
+        record["locked"] = record["version"] in locked_versions
+
+    return sorted(records, key=lambda r: (
+        gradle_version.version_key(r["version"]), r["subtree"]))
+
+
+def prune_orphans(
+        records: list[dict],
+        dry_run: bool = False,
+        verbose: bool = False) -> tuple[int, int]:
+    """
+    Remove the orphaned version directories of versions that are not in use.
+
+    The subtrees of a version are removed all or nothing: if any of them is
+    locked, all of them are skipped. Locks are checked again right before
+    the removal.
+
+    Args:
+        records (list): As returned by `analyze_caches`.
+        dry_run (bool, optional): Only print what would be removed.
+        verbose (bool, optional): Print each removal.
+
+    Returns:
+        tuple: The number of directories removed, and the bytes freed.
+    """
+    removed, freed = 0, 0
+    daemon_versions = None if dry_run else get_running_daemon_versions()
+
+    records_by_version = {}
+    for record in records:
+        if record["orphan"]:
+            records_by_version.setdefault(record["version"], []).append(record)
+
+    for version, version_records in records_by_version.items():
+        in_use = any(r["locked"] for r in version_records)
+        if not in_use and not dry_run:
+            in_use = version in daemon_versions or any(
+                is_dir_locked(r["path"]) for r in version_records)
+        if in_use:
+            for record in version_records:
+                print(f"Skipping {record['path']}: Gradle {version} is in use.")
+            continue
+
+        for record in version_records:
+            if dry_run:
+                print(f"[DRY-RUN] Would remove {record['path']}"
+                      f" ({disk.format_size(record['bytes'])})")
+                removed, freed = removed + 1, freed + record["bytes"]
+                continue
+
+            try:
+                shutil.rmtree(record["path"])
+            except OSError as e:
+                print(f"Could not remove {record['path']}: {e}", file=sys.stderr)
+                continue
+
+            if verbose:
+                print(f"Removed {record['path']} ({disk.format_size(record['bytes'])})")
+            removed, freed = removed + 1, freed + record["bytes"]
+
+    return removed, freed
+
+
+__all__ = [
+    get_gradle_user_home,
+    iter_version_dirs,
+    get_running_daemon_versions,
+    is_file_locked,
+    is_dir_locked,
+    analyze_caches,
+    prune_orphans,
+]
@@ -0,0 +1,241 @@
+# File:    <repo>/src/gvm/catalog.py
+# Date:    2024-07-03
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+This `catalog` sub module of the `gvm` package provides a locally cached copy
+of Gradle's remote version catalog (the `versions/all` JSON).
+
+The catalog is stored in the gvm state directory as a prebuilt index, together
+with the `ETag` / `Last-Modified` validators of the response it was built from.
+Once the cache is older than its TTL, it is revalidated with a conditional GET.
+Whenever the network is unavailable (or `offline` is requested), queries are
+answered from the cache alone.
+"""
+
+import os
+import sys
+import json
+import time
+import http.client
+import urllib.error
+import urllib.request
+from typing import Optional
+
+from gvm import state, version as gradle_version
+
+
+DEFAULT_CATALOG_URL = "https://services.gradle.org/versions/all"
+DEFAULT_CATALOG_TTL = 24 * 60 * 60  # seconds
+DEFAULT_REQUEST_TIMEOUT = 10  # seconds
+
+CATALOG_URL_ENV_VAR = "GVM_CATALOG_URL"
+CATALOG_TTL_ENV_VAR = "GVM_CATALOG_TTL"
+
+CATALOG_FILE_NAME = "catalog.json"
+CATALOG_FORMAT = 1
+
+
+def get_catalog_url() -> str:
+    """Get the catalog URL, from `GVM_CATALOG_URL` or the Gradle default."""
+    return os.environ.get(CATALOG_URL_ENV_VAR) or DEFAULT_CATALOG_URL
+
+
+def get_catalog_ttl() -> int:
+    """Get the catalog TTL in seconds, from `GVM_CATALOG_TTL` or the default."""
+    try:
+        return int(os.environ.get(CATALOG_TTL_ENV_VAR, DEFAULT_CATALOG_TTL))
+    except ValueError:
+        return DEFAULT_CATALOG_TTL
+
+
+def get_catalog_file() -> str:
+    """Get the path of the catalog cache file in the gvm state directory."""
+    return state.get_state_file(CATALOG_FILE_NAME)
+
+
+def build_index(entries: list[dict]) -> dict:
+    """
+    Build the query index from the entries of Gradle's versions JSON.
+
+    Args:
+        entries (list): The decoded `versions/all` JSON.
+
+    Returns:
+        dict: With keys
+            - `versions`: version -> flags and URLs,
+            - `latest`: major -> latest (non broken) final release,
+            - `current`: the version Gradle marks as current, if any.
+    """
+    versions = {}
+    latest = {}
+    current = None
+
+    for entry in entries:
+        name = entry.get("version")
+        if not name:
+            continue
+
+        versions[name] = {
+            "rc": bool(entry.get("rcFor")),
+            "milestone": bool(entry.get("milestoneFor")),
+            "nightly": bool(entry.get("snapshot") or entry.get("nightly")
+                            or entry.get("releaseNightly")),
+            "broken": bool(entry.get("broken")),
+            "build_time": entry.get("buildTime"),
+            "download_url": entry.get("downloadUrl"),
+            "checksum_url": entry.get("checksumUrl"),
+        }
+
+        if entry.get("current"):
+            current = name
+
+        flags = versions[name]
+        is_final = not (flags["rc"] or flags["milestone"] or flags["nightly"])
+        major = gradle_version.get_major(name)
+        if is_final and not flags["broken"] and major is not None:
+            key = str(major)
+            if key not in latest or gradle_version.version_key(
+                    name) > gradle_version.version_key(latest[key]):
+                latest[key] = name
+
+    return {"versions": versions, "latest": latest, "current": current}
+
+
+def fetch_catalog(
+        url: str,
+        cached: Optional[dict] = None,
+        timeout: float = DEFAULT_REQUEST_TIMEOUT) -> Optional[dict]:
+    """
+    Download the catalog, conditionally if a cached copy of it is given.
+
+    Args:
+        url (str): The versions JSON URL.
+        cached (dict, optional): The cached catalog, whose validators are sent
+            as `If-None-Match` / `If-Modified-Since`.
+        timeout (float, optional): The request timeout in seconds.
+
+    Returns:
+        dict: A fresh catalog, or `cached` if the server reports it unchanged.
+        None: If a fresh catalog could not be obtained and nothing was cached.
+
+    Raises:
+        urllib.error.URLError: If the server could not be reached.
+        http.client.HTTPException: If the response is malformed or truncated.
+        ValueError: If the response is not a valid versions JSON.
+    """
+    headers = {"Accept": "application/json"}
+    if cached and cached.get("url") == url:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            entries = json.loads(response.read().decode("utf-8"))
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached:
+            return dict(cached, fetched_at=time.time())
+        raise
+
+    if not isinstance(entries, list):
+        raise ValueError(f"Unexpected versions JSON from '{url}'")
+
+    return {
+        "format": CATALOG_FORMAT,
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": time.time(),
+        "index": build_index(entries),
+    }
+
+
+def load_catalog(
+        url: Optional[str] = None,
+        ttl: Optional[int] = None,
+        offline: bool = False,
+        refresh: bool = False,
+        path: Optional[str] = None) -> Optional[dict]:
+    """
+    Get the catalog, revalidating the local cache only when it has expired.
+
+    Args:
+        url (str, optional): The versions JSON URL. Defaults to `get_catalog_url()`.
+        ttl (int, optional): Seconds a cached catalog is used without
+            revalidation. Defaults to `get_catalog_ttl()`.
+        offline (bool, optional): Never touch the network, use the cache only.
+        refresh (bool, optional): Revalidate now, even if the TTL has not passed.
+        path (str, optional): The cache file. Defaults to the one in the gvm
+            state directory.
+
+    Returns:
+        dict: The catalog, see `fetch_catalog`.
+        None: If there is no usable catalog at all.
+    """
+    url = url or get_catalog_url()
+    ttl = get_catalog_ttl() if ttl is None else ttl
+    path = path or get_catalog_file()
+
+    cached = state.load_json(path, CATALOG_FORMAT)
+    if offline:
+        # any cached catalog beats none, even one from another URL
+        return cached
+
+    if cached and cached.get("url") != url:
+        cached = None
+
+    is_fresh = cached and time.time() - cached.get("fetched_at", 0) < ttl
+    if is_fresh and not refresh:
+        return cached
+
+    try:
+        catalog = fetch_catalog(url, cached)
+    except (urllib.error.URLError, http.client.HTTPException, OSError, ValueError) as e:
+        print(f"Could not update the version catalog from '{url}': {e}", file=sys.stderr)
+        return cached
+
+    state.save_json(path, catalog)
+    return catalog
+
+
+def get_entry(catalog: dict, version: str) -> Optional[dict]:
+    """Get the catalog entry of a Gradle version, or None if it is unknown."""
+    return catalog["index"]["versions"].get(version)
+
+
+def get_latest(catalog: dict, major: Optional[int] = None) -> Optional[str]:
+    """
+    Get the latest final release, overall or of a specific major version.
+
+    Args:
+        catalog (dict): The catalog, as returned by `load_catalog`.
+        major (int, optional): Restrict to this major version.
+
+    Returns:
+        str: The latest version.
+        None: If the catalog has no matching release.
+    """
+    latest = catalog["index"]["latest"]
+    if major is not None:
+        return latest.get(str(major))
+    if not latest:
+        return None
+    return max(latest.values(), key=gradle_version.version_key)
+
+
+__all__ = [
+    get_catalog_url,
+    get_catalog_ttl,
+    get_catalog_file,
+    build_index,
+    fetch_catalog,
+    load_catalog,
+    get_entry,
+    get_latest,
+]
@@ -0,0 +1,58 @@
+# File:    <repo>/src/gvm/disk.py
+# Date:    2024-07-04
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+This `disk` sub module of the `gvm` package provides disk usage helpers.
+"""
+
+import os
+
+
+def get_dir_size(path: str) -> int:
+    """
+    Get the total size of the regular files below a directory.
+
+    The tree is walked iteratively with `os.scandir`, keeping only a stack of
+    pending directories in memory, never a list of all file paths. Symlinks
+    are not followed, and entries that vanish or cannot be read are skipped.
+
+    Args:
+        path (str): The directory to measure.
+
+    Returns:
+        int: The total size in bytes.
+    """
+    total = 0
+    pending = [path]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+def format_size(size: int) -> str:
+    """Format a size in bytes for humans, e.g. `1.5 GiB`."""
+    value = float(size)
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+    return f"{value:.1f} TiB"
+
+
+__all__ = [
+    get_dir_size,
+    format_size,
+]
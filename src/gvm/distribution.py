@@ -0,0 +1,272 @@
+# File:    <repo>/src/gvm/distribution.py
+# Date:    2024-07-02
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+This `distribution` sub module of the `gvm` package identifies an unpacked
+Gradle distribution from its own metadata, rather than from directory names.
+
+Gradle stamps every distribution with a build receipt, e.g.:
+
+    versionNumber=8.7
+    buildTimestampIso=2024-03-22 15\\:52\\:46 UTC
+    commitId=650af14d7653aa949fce5e886e685efc9cf97c10
+
+The receipt lives inside one of the small `lib/gradle-*.jar` files. Only the
+zip central directory of that jar and the receipt entry itself are read, into
+memory. Nothing is extracted to disk.
+"""
+
+import os
+import re
+import sys
+import zipfile
+from typing import Optional
+
+from gvm import version
+
+
+# Jars known to carry the build receipt, in order of preference
+RECEIPT_JAR_RE = re.compile(
+    r"^gradle-(?P<module>core-api|base-services|runtime-api-info|build-process-services)"
+    r"-(?P<version>" + version.VERSION_PATTERN + r")\.jar$")
+
+RECEIPT_JAR_MODULES = [
+    "core-api",
+    "base-services",
+    "runtime-api-info",
+    "build-process-services",
+]
+
+# Entry (base) names of the build receipt inside a jar, or loose in the dist
+RECEIPT_ENTRY_NAMES = [
+    "build-receipt.properties",
+    "gradle-version-info",
+]
+
+# Launcher scripts expected in `<dist>/bin`
+GRADLE_BIN_FILE_NAMES = [
+    "gradle",
+    "gradle.bat",
+]
+
+# How many directory levels below a dists root to look for distributions,
+# e.g. `gradle-8.7-bin/<hash>/gradle-8.7` is found at the third level
+MAX_DISTS_DEPTH = 3
+
+
+def parse_properties(text: str) -> dict[str, str]:
+    """
+    Parse the (simple subset of the) Java `.properties` format used by Gradle.
+
+    Args:
+        text (str): The properties file content.
+
+    Returns:
+        dict: The key/value pairs, with `\\`-escapes resolved.
+    """
+    properties = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line[0] in "#!":
+            continue
+        parts = re.split(r"(?<!\\)[=:]", line, maxsplit=1)
+        key = parts[0]
+        value = parts[1] if len(parts) > 1 else ""
+        properties[_unescape(key.strip())] = _unescape(value.strip())
+    return properties
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+def find_receipt_jars(lib_dir: str) -> list[str]:
+    """
+    Find the jars in a distribution's `lib` dir that may carry the build receipt.
+
+    Args:
+        lib_dir (str): The distribution's `lib` directory.
+
+    Returns:
+        list: The jar paths, ordered by preference.
+    """
+    try:
+        names = os.listdir(lib_dir)
+    except OSError:
+        return []
+
+    matches = [(RECEIPT_JAR_RE.match(n), n) for n in names]
+    matches = [(m.group("module"), n) for m, n in matches if m]
+    matches.sort(key=lambda mn: RECEIPT_JAR_MODULES.index(mn[0]))
+    return [os.path.join(lib_dir, n) for _, n in matches]
+
+
+def read_receipt_from_jar(jar_path: str) -> Optional[dict[str, str]]:
+    """
+    Read the build receipt from a jar, without extracting anything to disk.
+
+    Args:
+        jar_path (str): The path of the jar file.
+
+    Returns:
+        dict: The receipt properties.
+        None: If the jar has no receipt or could not be read.
+    """
+    try:
+        with zipfile.ZipFile(jar_path) as jar:
+            for entry in jar.namelist():
+                if os.path.basename(entry) in RECEIPT_ENTRY_NAMES:
+                    return parse_properties(
+                        jar.read(entry).decode("iso-8859-1"))
+    except (OSError, zipfile.BadZipFile) as e:
+        print(f"Could not read '{jar_path}': {e}", file=sys.stderr)
+    return None
+
+
+def read_receipt_from_dir(dist_dir: str) -> Optional[tuple[dict[str, str], str]]:
+    """
+    Read a build receipt that lies loose in the distribution directory.
+
+    Args:
+        dist_dir (str): The distribution (pseudo GRADLE_HOME) directory.
+
+    Returns:
+        tuple: The receipt properties, and the path of the receipt file.
+        None: If there is no loose receipt.
+    """
+    for name in RECEIPT_ENTRY_NAMES:
+        path = os.path.join(dist_dir, name)
+        try:
+            with open(path, "r", encoding="iso-8859-1") as f:
+                return parse_properties(f.read()), path
+        except OSError:
+            continue
+    return None
+
+
+def is_gradle_distribution(dist_dir: str) -> bool:
+    """
+    Check if a directory looks like an unpacked Gradle distribution, i.e. has
+    a `bin/gradle` (or `bin/gradle.bat`) launcher and a `lib` directory.
+    """
+    bin_dir = os.path.join(dist_dir, "bin")
+    return os.path.isdir(os.path.join(dist_dir, "lib")) and any(
+        os.path.isfile(os.path.join(bin_dir, n)) for n in GRADLE_BIN_FILE_NAMES)
+
+
+def find_distribution_paths(
+        start_dir: str,
+        paths: Optional[list[str]] = None,
+        max_depth: int = MAX_DISTS_DEPTH) -> list[str]:
+    """
+    Find the Gradle distributions below a directory, e.g. a wrapper dists root.
+
+    Any directory that `is_gradle_distribution` accepts is found, whatever its
+    name, so renamed or hand-copied installs are found too. Directories that
+    cannot be listed are reported on stderr and skipped.
+
+    Args:
+        start_dir (str): The directory to search.
+        paths (list, optional): A list to append the found paths to.
+        max_depth (int, optional): How many directory levels to descend.
+
+    Returns:
+        list: The distribution (pseudo GRADLE_HOME) directories.
+    """
+    if paths is None:
+        paths = []
+
+    try:
+        sub_dirs = [d for d in os.listdir(start_dir)
+                    if os.path.isdir(os.path.join(start_dir, d))]
+    except PermissionError:
+        print(
+            f"Permission denied: Unable to list directories in '{start_dir}'.",
+            file=sys.stderr)
+        return paths
+    except OSError as e:
+        print(
+            f"Unable to list directories in '{start_dir}': {e}",
+            file=sys.stderr)
+        return paths
+
+    for sub_dir in sub_dirs:
+        sub_dir_path = os.path.join(start_dir, sub_dir)
+        if is_gradle_distribution(sub_dir_path):
+            paths.append(sub_dir_path)
+        elif max_depth > 1:
+            find_distribution_paths(sub_dir_path, paths, max_depth - 1)
+
+    return paths
+
+
+def get_stamp(dist_dir: str) -> Optional[int]:
+    """
+    Get a cheap stamp that changes whenever the distribution's `lib` dir
+    changes, used to invalidate cached probe results.
+
+    Returns:
+        int: The `lib` directory's modification time in nanoseconds.
+        None: If the `lib` directory does not exist.
+    """
+    try:
+        return os.stat(os.path.join(dist_dir, "lib")).st_mtime_ns
+    except OSError:
+        return None
+
+
+def probe_distribution(dist_dir: str) -> Optional[dict[str, Optional[str]]]:
+    """
+    Identify a Gradle distribution from its metadata.
+
+    The build receipt is preferred. If none can be found, the version embedded
+    in the receipt jar's file name is used instead.
+
+    Args:
+        dist_dir (str): The distribution (pseudo GRADLE_HOME) directory.
+
+    Returns:
+        dict: With keys `version`, `build_time`, `commit` and `source` (the
+            file the information was read from).
+        None: If the directory could not be identified as a Gradle distribution.
+    """
+    lib_dir = os.path.join(dist_dir, "lib")
+    jars = find_receipt_jars(lib_dir)
+
+    receipt, source = read_receipt_from_dir(dist_dir) or (None, None)
+    for jar in jars:
+        if receipt:
+            break
+        receipt, source = read_receipt_from_jar(jar), jar
+
+    if receipt and receipt.get("versionNumber"):
+        return {
+            "version": receipt["versionNumber"],
+            "build_time": receipt.get("buildTimestampIso") or receipt.get("buildTimestamp"),
+            "commit": receipt.get("commitId"),
+            "source": source,
+        }
+
+    if jars:
+        return {
+            "version": RECEIPT_JAR_RE.match(os.path.basename(jars[0])).group("version"),
+            "build_time": None,
+            "commit": None,
+            "source": jars[0],
+        }
+
+    return None
+
+
+__all__ = [
+    parse_properties,
+    find_receipt_jars,
+    read_receipt_from_jar,
+    read_receipt_from_dir,
+    is_gradle_distribution,
+    find_distribution_paths,
+    get_stamp,
+    probe_distribution,
+]
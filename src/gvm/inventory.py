@@ -0,0 +1,306 @@
+# File:    <repo>/src/gvm/inventory.py
+# Date:    2024-07-02
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+This `inventory` sub module of the `gvm` package keeps a persistent record of
+the Gradle distributions gvm has seen, so that each distribution's metadata is
+probed once, and not on every invocation.
+
+Entries are keyed by distribution path and invalidated when the distribution's
+`lib` directory changes.
+
+On shared build hosts, `scan_all_users` builds a system wide index of which
+distributions exist in which user's `~/.gradle/wrapper/dists`, and how much of
+that space is taken up by duplicated copies.
+"""
+
+import os
+import re
+import sys
+import json
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Iterator, Optional
+
+from gvm import disk, distribution, state
+from reflect import user
+
+
+INVENTORY_FILE_NAME = "inventory.json"
+INVENTORY_FORMAT = 1
+
+SHARED_INVENTORY_FILE_NAME = "shared-inventory.jsonl"
+
+# A user's wrapper dists root, relative to their home directory
+USER_DISTS_DIR = os.path.join(".gradle", "wrapper", "dists")
+
+_FLAVOR_DIR_RE = re.compile(r"^gradle-.+-(?P<flavor>all|bin)$")
+
+
+def get_inventory_file() -> str:
+    """Get the path of the inventory file in the gvm state directory."""
+    return state.get_state_file(INVENTORY_FILE_NAME)
+
+
+def load_inventory(path: Optional[str] = None) -> dict:
+    """
+    Load the inventory from disk.
+
+    A missing, unreadable or outdated inventory file yields an empty inventory.
+
+    Args:
+        path (str, optional): The inventory file. Defaults to the one in the
+            gvm state directory.
+
+    Returns:
+        dict: The inventory, with a `distributions` mapping of path -> entry.
+    """
+    path = path or get_inventory_file()
+    return state.load_json(path, INVENTORY_FORMAT) or {
+        "format": INVENTORY_FORMAT, "distributions": {}}
+
+
+def save_inventory(inventory: dict, path: Optional[str] = None) -> None:
+    """
+    Save the inventory to disk, if it changed.
+
+    Args:
+        inventory (dict): The inventory, as returned by `load_inventory`.
+        path (str, optional): The inventory file. Defaults to the one in the
+            gvm state directory.
+    """
+    path = path or get_inventory_file()
+    state.save_json(path, inventory, indent=2, only_if_changed=True)
+
+
+def get_shared_inventory_file() -> str:
+    """Get the path of the all users index file in the gvm state directory."""
+    return state.get_state_file(SHARED_INVENTORY_FILE_NAME)
+
+
+def get_distribution_info(dist_dir: str, inventory: dict) -> Optional[dict]:
+    """
+    Get the metadata of a distribution, probing it only if the inventory has no
+    up to date entry for it. New probe results are recorded in the inventory.
+
+    Args:
+        dist_dir (str): The distribution (pseudo GRADLE_HOME) directory.
+        inventory (dict): The inventory, as returned by `load_inventory`.
+
+    Returns:
+        dict: The distribution metadata, see `distribution.probe_distribution`.
+        None: If the distribution could not be identified.
+    """
+    entries = inventory["distributions"]
+    stamp = distribution.get_stamp(dist_dir)
+
+    entry = entries.get(dist_dir)
+    if entry is not None and stamp is not None and entry.get("stamp") == stamp:
+        return entry.get("info")
+
+    info = distribution.probe_distribution(dist_dir)
+    if stamp is None:
+        entries.pop(dist_dir, None)
+    else:
+        entries[dist_dir] = {"stamp": stamp, "info": info}
+    return info
+
+
+def prune_inventory(inventory: dict, start_dir: str, seen_paths: list[str]) -> None:
+    """
+    Drop the entries below a scanned directory whose distribution was not seen
+    in the scan, i.e. that have been removed since.
+
+    Args:
+        inventory (dict): The inventory, as returned by `load_inventory`.
+        start_dir (str): The directory that was scanned.
+        seen_paths (list): The distribution paths found in the scan.
+    """
+    prefix = os.path.join(start_dir, "")
+    seen = set(seen_paths)
+    entries = inventory["distributions"]
+    for dist_dir in [p for p in entries if p.startswith(prefix) and p not in seen]:
+        del entries[dist_dir]
+
+
+def get_flavor_from_path(dist_dir: str) -> Optional[str]:
+    """Get the distribution type (`all` or `bin`) from the wrapper dir names."""
+    for path_part in reversed(dist_dir.split(os.sep)):
+        match = _FLAVOR_DIR_RE.match(path_part)
+        if match:
+            return match.group("flavor")
+    return None
+
+
+def iter_user_dists_roots() -> Iterator[tuple[str, str]]:
+    """
+    Enumerate the wrapper dists roots of all users that have one.
+
+    Users sharing a home directory are only reported once.
+
+    Yields:
+        tuple: The (username, dists root) of each user.
+    """
+    seen_homes = set()
+    for uid in user.get_uids():
+        home_dir = user.get_home_dir(uid)
+        if not home_dir or home_dir in seen_homes:
+            continue
+        seen_homes.add(home_dir)
+
+        dists_root = os.path.join(home_dir, USER_DISTS_DIR)
+        if os.path.isdir(dists_root):
+            yield user.get_username(uid) or str(uid), dists_root
+
+
+def get_shared_dist_path(shared_root: str, record: dict) -> Optional[str]:
+    """
+    Get where a distribution would live once consolidated into a shared root,
+    laid out like a wrapper dists root: `<root>/gradle-<version>-<flavor>/gradle-<version>`.
+
+    Returns:
+        str: The shared distribution path.
+        None: If the distribution's version is unknown.
+    """
+    if not record["version"]:
+        return None
+    name = f"gradle-{record['version']}"
+    flavor_dir = f"{name}-{record['flavor']}" if record["flavor"] else name
+    return os.path.join(shared_root, flavor_dir, name)
+
+
+def scan_dists_root(username: str, dists_root: str) -> list[dict]:
+    """
+    Identify and measure the distributions in a single dists root.
+
+    Distributions are probed directly, and not recorded in the (per host)
+    inventory, so a scan of many users leaves no trace in memory or on disk.
+    Errors are reported on stderr, and end the scan of this root only.
+
+    Args:
+        username (str): The owner of the dists root.
+        dists_root (str): The wrapper dists root to scan.
+
+    Returns:
+        list: One small record per distribution.
+    """
+    try:
+        dist_dirs = distribution.find_distribution_paths(dists_root)
+    except OSError as e:
+        print(f"Could not scan '{dists_root}' of user {username}: {e}", file=sys.stderr)
+        return []
+
+    records = []
+    for dist_dir in dist_dirs:
+        try:
+            info = distribution.probe_distribution(dist_dir) or {}
+        except OSError as e:
+            print(f"Could not identify '{dist_dir}': {e}", file=sys.stderr)
+            continue
+        records.append({
+            "user": username,
+            "path": dist_dir,
+            "version": info.get("version"),
+            "commit": info.get("commit"),
+            "flavor": get_flavor_from_path(dist_dir),
+            "bytes": disk.get_dir_size(dist_dir),
+        })
+    return records
+
+
+def scan_all_users(
+        shared_root: str,
+        max_workers: Optional[int] = None,
+        index_path: Optional[str] = None) -> dict:
+    """
+    Scan every user's wrapper dists root in parallel and build a shared index.
+
+    Results are streamed: each distribution record is appended to the index
+    file (JSON lines) as soon as its user has been scanned, and only per
+    version totals are kept in memory. At most `2 * max_workers` users are in
+    flight at any time.
+
+    Args:
+        shared_root (str): The shared dists root that duplicated copies would
+            be consolidated into.
+        max_workers (int, optional): Number of parallel scans.
+            Defaults to the number of CPUs.
+        index_path (str, optional): The index file to write. Defaults to the
+            one in the gvm state directory.
+
+    Returns:
+        dict: Totals keyed by `version/flavor/commit`, each with the number of
+            `copies`, distinct `users`, total `bytes`, the `shared_path` to
+            consolidate into, whether that path is already `shared`, and the
+            `reclaimable` bytes once all copies use the shared one.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    index_path = index_path or get_shared_inventory_file()
+    summary = {}
+
+    def collect(records: list[dict], index_file) -> None:
+        for record in records:
+            index_file.write(json.dumps(record) + "\n")
+
+            key = f"{record['version']}/{record['flavor']}/{record['commit']}"
+            totals = summary.setdefault(key, {
+                "version": record["version"],
+                "flavor": record["flavor"],
+                "commit": record["commit"],
+                "copies": 0,
+                "users": 0,
+                "bytes": 0,
+                "reclaimable": 0,
+                "shared_path": get_shared_dist_path(shared_root, record),
+                "shared": False,
+                "last_user": None,
+            })
+            totals["copies"] += 1
+            totals["bytes"] += record["bytes"]
+            if totals["copies"] > 1 and totals["shared_path"]:
+                totals["reclaimable"] += record["bytes"]
+            else:
+                totals["copy_bytes"] = record["bytes"]
+            if totals["last_user"] != record["user"]:
+                totals["users"] += 1
+                totals["last_user"] = record["user"]
+
+    roots = iter_user_dists_roots()
+    with open(index_path, "w", encoding="utf-8") as index_file, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for username, dists_root in roots:
+            pending.add(executor.submit(
+                scan_dists_root, username, dists_root))
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future.result(), index_file)
+
+        for future in pending:
+            collect(future.result(), index_file)
+
+    for totals in summary.values():
+        del totals["last_user"]
+        copy_bytes = totals.pop("copy_bytes")
+        # an existing shared copy makes every private copy reclaimable
+        if totals["shared_path"] and distribution.is_gradle_distribution(totals["shared_path"]):
+            totals["shared"] = True
+            totals["reclaimable"] += copy_bytes
+    return summary
+
+
+__all__ = [
+    get_inventory_file,
+    load_inventory,
+    save_inventory,
+    get_shared_inventory_file,
+    get_distribution_info,
+    prune_inventory,
+    get_flavor_from_path,
+    get_shared_dist_path,
+    iter_user_dists_roots,
+    scan_dists_root,
+    scan_all_users,
+]
@@ -0,0 +1,291 @@
+# File:    <repo>/src/gvm/jdk.py
+# Date:    2024-07-05
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+This `jdk` sub module of the `gvm` package discovers installed JDKs and picks
+one that can run a given Gradle version.
+
+JDKs are identified from their `release` file, e.g.:
+
+    IMPLEMENTOR="Eclipse Adoptium"
+    JAVA_VERSION="17.0.11"
+
+so no JVM is ever launched. Results are cached in the gvm state directory and
+re-read only when a `release` file changes, which keeps a warm resolution to a
+handful of `listdir`/`stat` calls.
+"""
+
+import os
+import re
+from typing import Optional
+
+from gvm import state, version as gradle_version
+from reflect import user
+
+
+JDK_CACHE_FILE_NAME = "jdks.json"
+JDK_CACHE_FORMAT = 1
+
+# Directories that contain JDK installations, one per sub directory. Paths
+# starting with `~` are relative to the home of the user gvm acts on behalf of
+DEFAULT_JDK_SEARCH_ROOTS = [
+    "/usr/lib/jvm",
+    "/usr/java",
+    "/usr/local/java",
+    "/opt/java",
+    "/opt/jdk",
+    "/Library/Java/JavaVirtualMachines",
+    "~/Library/Java/JavaVirtualMachines",
+    "~/.sdkman/candidates/java",
+    "~/.asdf/installs/java",
+    "~/.jdks",
+    "~/.gradle/jdks",
+]
+
+# Java versions, and the first Gradle version that supports running on them,
+# see https://docs.gradle.org/current/userguide/compatibility.html
+GRADLE_JDK_COMPATIBILITY = [
+    (8, "2.0"),
+    (9, "4.3"),
+    (10, "4.7"),
+    (11, "5.0"),
+    (12, "5.4"),
+    (13, "6.0"),
+    (14, "6.3"),
+    (15, "6.7"),
+    (16, "7.0"),
+    (17, "7.3"),
+    (18, "7.5"),
+    (19, "7.6"),
+    (20, "8.3"),
+    (21, "8.5"),
+    (22, "8.8"),
+    (23, "8.10"),
+    (24, "8.14"),
+    (25, "9.1.0"),
+]
+
+# Gradle versions, and the minimum Java version they need to run
+GRADLE_MIN_JDK = [
+    ("0.0", 7),
+    ("5.0", 8),
+    ("9.0.0", 17),
+]
+
+_RELEASE_LINE_RE = re.compile(r'^(?P<key>[A-Z_]+)="?(?P<value>[^"]*)"?$')
+
+
+class NoCompatibleJdkError(LookupError):
+    """Raised when none of the installed JDKs can run a Gradle version."""
+
+
+def parse_release_file(text: str) -> dict[str, str]:
+    """Parse the KEY="value" lines of a JDK `release` file."""
+    properties = {}
+    for line in text.splitlines():
+        match = _RELEASE_LINE_RE.match(line.strip())
+        if match:
+            properties[match.group("key")] = match.group("value")
+    return properties
+
+
+def get_feature_version(java_version: str) -> Optional[int]:
+    """
+    Get the feature (major) version of a Java version string.
+
+    Args:
+        java_version (str): e.g. `1.8.0_402`, `11.0.22` or `21`.
+
+    Returns:
+        int: The feature version, e.g. 8, 11 or 21.
+        None: If the version string could not be parsed.
+    """
+    numbers = [int(n) for n in re.findall(r"\d+", java_version)]
+    if not numbers:
+        return None
+    if numbers[0] == 1 and len(numbers) > 1:
+        return numbers[1]
+    return numbers[0]
+
+
+def _java_version_key(jdk: dict) -> tuple:
+    return tuple(int(n) for n in re.findall(r"\d+", jdk["version"]))
+
+
+def get_search_roots(extra_roots: Optional[list[str]] = None) -> list[str]:
+    """
+    Get the existing directories to search for JDKs in.
+
+    Args:
+        extra_roots (list, optional): Additional (platform specific) roots,
+            searched after the defaults.
+
+    Returns:
+        list: The absolute paths of the existing search roots.
+    """
+    home_dir = user.get_invoking_user_home_dir()
+
+    roots = []
+    for root in DEFAULT_JDK_SEARCH_ROOTS + (extra_roots or []):
+        if root.startswith("~"):
+            if not home_dir:
+                continue
+            root = os.path.join(home_dir, root[2:])
+        if root not in roots and os.path.isdir(root):
+            roots.append(root)
+    return roots
+
+
+def iter_candidate_homes(roots: list[str]):
+    """
+    Yield the candidate JDK home directories below the search roots, and the
+    `JAVA_HOME` of the environment, if set.
+
+    Symlinks are resolved, so that a JDK reachable through several paths (or
+    through gvm's own `current` symlink) is reported once, by its real path.
+    """
+    java_home = os.environ.get("JAVA_HOME")
+    if java_home:
+        yield os.path.realpath(java_home)
+
+    for root in roots:
+        try:
+            names = os.listdir(root)
+        except OSError:
+            continue
+        for name in names:
+            home = os.path.join(root, name)
+            yield os.path.realpath(home)
+            # macOS bundles keep the actual JDK home nested
+            yield os.path.realpath(os.path.join(home, "Contents", "Home"))
+
+
+def probe_jdk(home: str) -> Optional[dict]:
+    """
+    Identify a JDK from its `release` file, without launching it.
+
+    Args:
+        home (str): The JDK home directory.
+
+    Returns:
+        dict: With keys `home`, `version`, `feature` and `vendor`.
+        None: If the directory is not a JDK (has no usable `release` file).
+    """
+    try:
+        with open(os.path.join(home, "release"), "r", encoding="utf-8",
+                  errors="replace") as f:
+            release = parse_release_file(f.read())
+    except OSError:
+        return None
+
+    java_version = release.get("JAVA_VERSION")
+    feature = get_feature_version(java_version) if java_version else None
+    if feature is None:
+        return None
+
+    return {
+        "home": home,
+        "version": java_version,
+        "feature": feature,
+        "vendor": release.get("IMPLEMENTOR") or release.get("JAVA_VENDOR"),
+    }
+
+
+def discover_jdks(
+        extra_roots: Optional[list[str]] = None,
+        cache_path: Optional[str] = None) -> list[dict]:
+    """
+    Discover the installed JDKs, using the cache for unchanged `release` files.
+
+    Args:
+        extra_roots (list, optional): See `get_search_roots`.
+        cache_path (str, optional): The cache file. Defaults to the one in the
+            gvm state directory.
+
+    Returns:
+        list: The JDKs, see `probe_jdk`, newest first.
+    """
+    cache_path = cache_path or state.get_state_file(JDK_CACHE_FILE_NAME)
+    cache = state.load_json(cache_path, JDK_CACHE_FORMAT) or {
+        "format": JDK_CACHE_FORMAT, "jdks": {}}
+    cached_jdks = cache["jdks"]
+
+    found = {}
+    for home in iter_candidate_homes(get_search_roots(extra_roots)):
+        if home in found:
+            continue
+        try:
+            stamp = os.stat(os.path.join(home, "release")).st_mtime_ns
+        except OSError:
+            continue
+
+        entry = cached_jdks.get(home)
+        if entry is None or entry.get("stamp") != stamp:
+            entry = {"stamp": stamp, "info": probe_jdk(home)}
+        found[home] = entry
+
+    if found != cached_jdks:
+        cache["jdks"] = found
+        state.save_json(cache_path, cache)
+
+    jdks = [entry["info"] for entry in found.values() if entry["info"]]
+    return sorted(jdks, key=_java_version_key, reverse=True)
+
+
+def get_supported_java_range(version: str) -> tuple[int, int]:
+    """
+    Get the range of Java feature versions that can run a Gradle version.
+
+    Args:
+        version (str): The Gradle version.
+
+    Returns:
+        tuple: The (minimum, maximum) Java feature versions, inclusive.
+    """
+    key = gradle_version.version_key(version)
+
+    # pre-releases of a `since` version already have its Java requirements
+    minimum = GRADLE_MIN_JDK[0][1]
+    for since, java in GRADLE_MIN_JDK:
+        if key[0] >= gradle_version.version_key(since)[0]:
+            minimum = java
+
+    maximum = GRADLE_JDK_COMPATIBILITY[0][0]
+    for java, since in GRADLE_JDK_COMPATIBILITY:
+        if key[0] >= gradle_version.version_key(since)[0]:
+            maximum = java
+
+    return minimum, maximum
+
+
+def select_jdk(version: str, jdks: list[dict]) -> Optional[dict]:
+    """
+    Pick the newest JDK that can run a Gradle version.
+
+    Args:
+        version (str): The Gradle version.
+        jdks (list): The JDKs to choose from, see `discover_jdks`.
+
+    Returns:
+        dict: The selected JDK.
+        None: If none of the JDKs can run the Gradle version.
+    """
+    minimum, maximum = get_supported_java_range(version)
+    compatible = [j for j in jdks if minimum <= j["feature"] <= maximum]
+    if not compatible:
+        return None
+    return max(compatible, key=_java_version_key)
+
+
+__all__ = [
+    parse_release_file,
+    get_feature_version,
+    get_search_roots,
+    iter_candidate_homes,
+    probe_jdk,
+    discover_jdks,
+    get_supported_java_range,
+    select_jdk,
+]
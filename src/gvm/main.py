@@ -22,6 +22,7 @@ from typing import Optional, Union
 
 
 from reflect import script, location, platform, runtime_env, runtime_os
+from gvm import caches, catalog, disk, distribution, inventory, jdk, warmup, version as gradle_version
 
 
 # Fallback to C: if system drive letter cannot be determined
@@ -31,98 +32,62 @@ if platform.is_windows_system() and not runtime_os.is_posix_compatible():
     SYSTEM_DRIVE_LETTER = SYSTEM_DRIVE_LETTER.upper()
     GRADLE_WRAPPER_DISTS_DIR = f"{SYSTEM_DRIVE_LETTER}:\\Tools\\Gradle\\wrapper\\dists"
     CURRENT_GRADLE_SYMLINK = f"{SYSTEM_DRIVE_LETTER}:\\Tools\\Gradle\\current"
+    CURRENT_JAVA_SYMLINK = f"{SYSTEM_DRIVE_LETTER}:\\Tools\\Java\\current"
+    JDK_SEARCH_ROOTS = [
+        f"{SYSTEM_DRIVE_LETTER}:\\Program Files\\{vendor_dir}" for vendor_dir in
+        ["Java", "Eclipse Adoptium", "Microsoft", "Zulu", "Amazon Corretto"]]
 elif (platform.is_windows_system() and runtime_os.is_posix_compatible()) or runtime_env.is_wsl():
     SYSTEM_DRIVE_LETTER = SYSTEM_DRIVE_LETTER.lower()
     GRADLE_WRAPPER_DISTS_DIR = f"/mnt/{SYSTEM_DRIVE_LETTER}/Tools/Gradle/wrapper/dists"
     CURRENT_GRADLE_SYMLINK = f"/mnt/{SYSTEM_DRIVE_LETTER}/Tools/Gradle/current"
+    CURRENT_JAVA_SYMLINK = f"/mnt/{SYSTEM_DRIVE_LETTER}/Tools/Java/current"
+    JDK_SEARCH_ROOTS = [
+        f"/mnt/{SYSTEM_DRIVE_LETTER}/Program Files/{vendor_dir}" for vendor_dir in
+        ["Java", "Eclipse Adoptium", "Microsoft", "Zulu", "Amazon Corretto"]]
 else:
     print("Unsupported platform, OS or runtime environment.")
     sys.exit(1)
 
 
-def contains_sub_bin_dir(path: str) -> bool:
-    return bool(any(d == "bin" for d in os.listdir(path)))
-
-
-def contains_gradle_bin_file(path: str) -> bool:
-    return bool(any(f.startswith("gradle") for f in os.listdir(path)))
-
-
-def ends_like_unzip_hash_dir(path: str) -> bool:
-    return bool(re.search(r"[a-z0-9]{25}$", path))
-
-
-def ends_like_gradle_dir(path: str) -> bool:
-    return bool(re.search(r"gradle-\d(?:\.\d)+-(?:all|bin)$", path))
-
-
 def is_gradle_version_dir(dirName: str) -> bool:
-    return bool(re.match(r"^gradle-\d(?:\.\d)+-(?:all|bin)$", dirName))
-
-
-def contains_only_one_dir(path: str) -> bool:
-    return len([d for d in os.listdir(path)
-               if os.path.isdir(os.path.join(path, d))]) == 1
-
-
-def find_gradle_version_paths_from(
-        start_dir: str, versions: Optional[list[str]] = None) -> list[str]:
-    if versions is None:
-        versions = []
-
-    try:
-        maybeGradleVerDirs = [
-            d for d in os.listdir(start_dir) if os.path.isdir(
-                os.path.join(
-                    start_dir, d))]
-    except PermissionError:
-        print(
-            f"Permission denied: Unable to list directories in '{start_dir}'.",
-            file=sys.stderr)
-        return versions
-
-    for maybeGradleVerDir in maybeGradleVerDirs:
-        maybeGradleVerDirPath = os.path.join(start_dir, maybeGradleVerDir)
-
-        if contains_only_one_dir(maybeGradleVerDirPath):
-            maybeHashDir = os.path.join(
-                maybeGradleVerDirPath,
-                os.listdir(maybeGradleVerDirPath)[0])
-            if ends_like_unzip_hash_dir(maybeHashDir):
-                versions.extend(find_gradle_version_paths_from(maybeHashDir))
-        else:
-            if contains_sub_bin_dir(maybeGradleVerDirPath) and contains_gradle_bin_file(
-                    os.path.join(maybeGradleVerDirPath, "bin")):
-                versions.append(maybeGradleVerDirPath)
+    return bool(re.match(
+        r"^gradle-" + gradle_version.VERSION_PATTERN + r"-(?:all|bin)$", dirName))
 
-    return versions
 
+def get_version_from_path(
+        path: str, dists_inventory: Optional[dict] = None) -> Optional[str]:
+    # Prefer the distribution's own metadata, directory names can be ambiguous
+    if dists_inventory is not None:
+        info = inventory.get_distribution_info(path, dists_inventory)
+        if info and info.get("version"):
+            return info["version"]
 
-def get_version_from_path(path: str) -> Optional[str]:
     path_parts = path.split(os.sep)
     path_parts.reverse()
     for path_part in path_parts:
         if is_gradle_version_dir(path_part):
-            return path_part.split("-")[1]
+            return path_part[len("gradle-"):].rsplit("-", 1)[0]
     return None
 
 
-def switch_gradle_version(
-        version: str,
-        dry_run: bool = False,
-        verbose: bool = False) -> None:
-    gradle_version_paths = find_gradle_version_paths_from(
-        GRADLE_WRAPPER_DISTS_DIR, [])
-    versions = [get_version_from_path(
-        path) for path in gradle_version_paths if get_version_from_path(path)]
+def find_gradle_version_dir(version: str, save: bool = True) -> str:
+    versions_by_path = get_versions_by_path(
+        GRADLE_WRAPPER_DISTS_DIR, save=save)
 
     matching_versions = [
-        v for v in gradle_version_paths if version == get_version_from_path(v)]
+        p for p, v in versions_by_path.items() if version == v]
 
     if not matching_versions:
         raise FileNotFoundError(f"Gradle version '{version}' does not exist.")
 
-    pseudo_gradle_home_dir = matching_versions[0]
+    return matching_versions[0]
+
+
+def switch_gradle_version(
+        version: str,
+        pseudo_gradle_home_dir: str,
+        dry_run: bool = False,
+        verbose: bool = False) -> None:
     pseudo_gradle_bin_dir = os.path.join(pseudo_gradle_home_dir, "bin")
 
     if dry_run:
@@ -131,32 +96,205 @@ def switch_gradle_version(
             f"[DRY-RUN] Would create symlink from {pseudo_gradle_bin_dir} to {CURRENT_GRADLE_SYMLINK}")
         return
 
-    if os.path.exists(CURRENT_GRADLE_SYMLINK) or os.path.islink(
-            CURRENT_GRADLE_SYMLINK):
+    replace_symlink(pseudo_gradle_bin_dir, CURRENT_GRADLE_SYMLINK, verbose=verbose)
+
+    print(f"Switched to Gradle version: {version}")
+
+
+def replace_symlink(target: str, symlink: str, verbose: bool = False) -> None:
+    # Resolve before removing the old symlink, the target may be reached
+    # through it (e.g. a JAVA_HOME that points at the current symlink)
+    target = os.path.realpath(target)
+    if target == os.path.abspath(symlink):
+        print(f"Refusing to create symlink {symlink} pointing to itself.")
+        sys.exit(1)
+
+    if os.path.exists(symlink) or os.path.islink(symlink):
         try:
-            os.remove(CURRENT_GRADLE_SYMLINK)
+            os.remove(symlink)
             if verbose:
-                print(f"Removed existing symlink: {CURRENT_GRADLE_SYMLINK}")
+                print(f"Removed existing symlink: {symlink}")
         except PermissionError as e:
             print(f"Permission denied: {e}")
             sys.exit(1)
 
     try:
-        os.symlink(pseudo_gradle_bin_dir, CURRENT_GRADLE_SYMLINK)
+        os.makedirs(os.path.dirname(symlink), exist_ok=True)
+        os.symlink(target, symlink)
         if verbose:
-            print(
-                f"Created symlink from {pseudo_gradle_bin_dir} to {CURRENT_GRADLE_SYMLINK}")
+            print(f"Created symlink from {target} to {symlink}")
     except OSError as e:
         print(f"Error creating symlink: {e}")
         sys.exit(1)
 
-    print(f"Switched to Gradle version: {version}")
+
+def select_java_home(version: str) -> dict:
+    jdks = jdk.discover_jdks(JDK_SEARCH_ROOTS)
+    selected = jdk.select_jdk(version, jdks)
+
+    if selected is None:
+        minimum, maximum = jdk.get_supported_java_range(version)
+        raise jdk.NoCompatibleJdkError(
+            f"No installed JDK can run Gradle {version} (needs Java {minimum} to {maximum}).")
+
+    return selected
+
+
+def switch_java_home(
+        selected: dict,
+        dry_run: bool = False,
+        verbose: bool = False) -> str:
+    if dry_run:
+        print(f"[DRY-RUN] Would select JDK {selected['version']} ({selected['vendor']})")
+        print(
+            f"[DRY-RUN] Would create symlink from {selected['home']} to {CURRENT_JAVA_SYMLINK}")
+        return selected["home"]
+
+    replace_symlink(selected["home"], CURRENT_JAVA_SYMLINK, verbose=verbose)
+
+    print(f"Switched to JDK {selected['version']} ({selected['vendor']})")
+    print(f"JAVA_HOME={CURRENT_JAVA_SYMLINK}")
+    return selected["home"]
+
+
+def warm_up_gradle_version(
+        version: str,
+        dist_dir: str,
+        jvm_args: Optional[str] = None,
+        java_home: Optional[str] = None,
+        dry_run: bool = False,
+        verbose: bool = False) -> int:
+    if dry_run:
+        print(f"[DRY-RUN] Would prefetch the jars of {dist_dir}")
+        print(f"[DRY-RUN] Would start a Gradle {version} daemon"
+              + (f" with JVM args '{jvm_args}'" if jvm_args else ""))
+        return 0
+
+    if verbose:
+        print(f"Warming up Gradle {version} ...")
+
+    result = warmup.warm_up(dist_dir, jvm_args=jvm_args, java_home=java_home)
+
+    if verbose:
+        print(f"Requested page cache prefetch of {result['jars']} jars"
+              f" ({disk.format_size(result['bytes'])})"
+              f" in {result['prefetch_request_seconds']:.2f}s")
+    if result["daemon_status"] is None:
+        print(f"Gradle {version} daemon warm-up timed out"
+              f" after {result['total_seconds']:.2f}s; the daemon may still be starting.")
+        return 1
+    if result["daemon_status"] != 0:
+        print(f"Gradle {version} daemon warm-up failed"
+              f" (exit code {result['daemon_status']}) after {result['total_seconds']:.2f}s.")
+        return 1
+
+    print(f"Warmed up Gradle {version} in {result['total_seconds']:.2f}s"
+          f" (daemon {result['daemon_seconds']:.2f}s).")
+    return 0
+
+
+def list_jdks() -> list[dict]:
+    return jdk.discover_jdks(JDK_SEARCH_ROOTS)
+
+
+def get_versions_by_path(
+        start_dir: str, save: bool = True) -> dict[str, Optional[str]]:
+    paths = distribution.find_distribution_paths(start_dir)
+
+    dists_inventory = inventory.load_inventory()
+    versions_by_path = {p: get_version_from_path(p, dists_inventory) for p in paths}
+    inventory.prune_inventory(dists_inventory, start_dir, paths)
+    if save:
+        inventory.save_inventory(dists_inventory)
+
+    return versions_by_path
 
 
 def list_gradle_versions(start_dir: str) -> list[str]:
-    versions = find_gradle_version_paths_from(start_dir, [])
-    return [get_version_from_path(v)
-            for v in versions if get_version_from_path(v)]
+    return [v for v in get_versions_by_path(start_dir).values() if v]
+
+
+def print_inventory(start_dir: str, verbose: bool = False) -> None:
+    dists_inventory = inventory.load_inventory()
+    paths = distribution.find_distribution_paths(start_dir)
+    inventory.prune_inventory(dists_inventory, start_dir, paths)
+
+    print(f"Gradle distributions in {start_dir}:")
+    for path in paths:
+        info = inventory.get_distribution_info(path, dists_inventory) or {}
+        print(f" - {info.get('version') or get_version_from_path(path) or '?'}"
+              f" ({info.get('build_time') or 'unknown build time'},"
+              f" commit {info.get('commit') or '?'})")
+        if verbose:
+            print(f"   {path}")
+
+    inventory.save_inventory(dists_inventory)
+
+
+def print_all_users_inventory(max_workers: Optional[int] = None) -> None:
+    summary = inventory.scan_all_users(
+        GRADLE_WRAPPER_DISTS_DIR, max_workers=max_workers)
+
+    totals = sorted(summary.values(),
+                    key=lambda t: gradle_version.version_key(t["version"] or ""))
+
+    print("Gradle distributions of all users:")
+    for t in totals:
+        print(f" - {t['version'] or '?'}-{t['flavor'] or '?'}:"
+              f" {t['copies']} copies, {t['users']} users,"
+              f" {disk.format_size(t['bytes'])}")
+        if t["reclaimable"] and t["shared"]:
+            print(f"   {disk.format_size(t['reclaimable'])} reclaimable"
+                  f" by using the shared copy in {t['shared_path']}")
+        elif t["reclaimable"]:
+            print(f"   {disk.format_size(t['reclaimable'])} reclaimable"
+                  f" by consolidating into {t['shared_path']}")
+
+    reclaimable = sum(t["reclaimable"] for t in totals)
+    print(f"Total: {disk.format_size(sum(t['bytes'] for t in totals))},"
+          f" of which {disk.format_size(reclaimable)} reclaimable"
+          f" by consolidating into {GRADLE_WRAPPER_DISTS_DIR}.")
+    print(f"Index written to {inventory.get_shared_inventory_file()}")
+
+
+def print_caches(
+        prune: bool = False,
+        dry_run: bool = False,
+        verbose: bool = False,
+        max_workers: Optional[int] = None) -> None:
+    gradle_user_home = caches.get_gradle_user_home()
+    if not gradle_user_home:
+        print("Could not determine the Gradle user home.")
+        sys.exit(1)
+
+    installed_versions = set()
+    for dists_dir in [GRADLE_WRAPPER_DISTS_DIR,
+                      os.path.join(gradle_user_home, "wrapper", "dists")]:
+        if os.path.isdir(dists_dir):
+            installed_versions.update(list_gradle_versions(dists_dir))
+
+    records = caches.analyze_caches(
+        installed_versions, gradle_user_home, max_workers=max_workers)
+
+    print(f"Version specific Gradle caches in {gradle_user_home}:")
+    for record in records:
+        status = "orphan" if record["orphan"] else "installed"
+        if record["locked"]:
+            status += ", in use"
+        print(f" - {record['version']} {record['subtree']}:"
+              f" {disk.format_size(record['bytes'])} ({status})")
+        if verbose:
+            print(f"   {record['path']}")
+
+    orphans = [r for r in records if r["orphan"]]
+    print(f"Total: {disk.format_size(sum(r['bytes'] for r in records))},"
+          f" of which {disk.format_size(sum(r['bytes'] for r in orphans))} orphaned.")
+
+    if prune:
+        removed, freed = caches.prune_orphans(
+            orphans, dry_run=dry_run, verbose=verbose)
+        prefix = "[DRY-RUN] Would have removed" if dry_run else "Removed"
+        print(f"{prefix} {removed} orphaned directories, {disk.format_size(freed)}.")
 
 
 def main():
@@ -170,6 +308,37 @@ def main():
         "--list",
         action="store_true",
         help="List available Gradle versions.")
+    parser.add_argument(
+        "--list-jdks",
+        action="store_true",
+        help="List installed JDKs.")
+    parser.add_argument(
+        "--jdk",
+        action="store_true",
+        help="With --use, also point JAVA_HOME at the newest installed JDK that supports the Gradle version.")
+    parser.add_argument(
+        "--warm",
+        action="store_true",
+        help="With --use, prefetch the new distribution and start a Gradle daemon for it.")
+    parser.add_argument(
+        "--warm-jvm-args",
+        metavar="ARGS",
+        help="JVM arguments for the --warm daemon, e.g. \"-Xmx2g -XX:+UseParallelGC\".")
+    parser.add_argument(
+        "--latest",
+        metavar="MAJOR",
+        nargs="?",
+        type=int,
+        const=-1,
+        help="Print the latest Gradle release, optionally of a MAJOR version, from the remote catalog.")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Answer remote catalog queries from the local cache only.")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Revalidate the cached remote catalog now, regardless of its age.")
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -187,20 +356,99 @@ def main():
             2],
         help="Set the log level: 0 for errors, 1 for info, 2 for debug.")
 
+    subparsers = parser.add_subparsers(dest="command")
+
+    inventory_parser = subparsers.add_parser(
+        "inventory",
+        help="Show the identified Gradle distributions.")
+    inventory_parser.add_argument(
+        "--all-users",
+        action="store_true",
+        help="Scan every user's ~/.gradle/wrapper/dists and report duplicated copies (privileged).")
+    inventory_parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Number of user dists roots to scan in parallel. Defaults to the number of CPUs.")
+
+    caches_parser = subparsers.add_parser(
+        "caches",
+        help="Show the disk usage of ~/.gradle/caches/<version> and ~/.gradle/daemon/<version>.")
+    caches_parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Remove the directories of Gradle versions that are no longer installed.")
+    caches_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="Print the intended actions without making any changes.")
+    caches_parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Number of directories to measure in parallel. Defaults to the number of CPUs.")
+
     args = parser.parse_args()
 
+    if args.jdk and not args.use:
+        parser.error("--jdk requires --use")
+    if args.warm_jvm_args and not args.warm:
+        parser.error("--warm-jvm-args requires --warm")
+    if args.warm and not args.use:
+        parser.error("--warm requires --use")
+
     verbose = args.verbose or (args.log_level and args.log_level > 0)
 
-    if args.list:
+    if args.command == "inventory":
+        if not args.all_users:
+            print_inventory(GRADLE_WRAPPER_DISTS_DIR, verbose=verbose)
+        elif not script.is_running_as_privileged_user():
+            print(
+                "To scan the Gradle distributions of all users, this script must be run as a privileged user.")
+            sys.exit(1)
+        else:
+            print_all_users_inventory(max_workers=args.jobs)
+
+    elif args.command == "caches":
+        print_caches(
+            prune=args.prune,
+            dry_run=args.dry_run,
+            verbose=verbose,
+            max_workers=args.jobs)
+
+    elif args.list:
         versions = list_gradle_versions(GRADLE_WRAPPER_DISTS_DIR)
-        unique_versions = sorted(
-            set(versions), key=lambda v: [
-                int(part) for part in v.split('.')])
+        unique_versions = sorted(set(versions), key=gradle_version.version_key)
 
         print("Available Gradle versions:")
         for version in unique_versions:
             print(f" - {version}")
 
+    elif args.list_jdks:
+        print("Installed JDKs:")
+        for found in list_jdks():
+            print(f" - {found['version']} ({found['vendor'] or 'unknown vendor'})")
+            if verbose:
+                print(f"   {found['home']}")
+
+    elif args.latest is not None:
+        versions_catalog = catalog.load_catalog(
+            offline=args.offline, refresh=args.refresh)
+        if versions_catalog is None:
+            print("The remote version catalog is not available.")
+            sys.exit(1)
+
+        major = None if args.latest < 0 else args.latest
+        latest = catalog.get_latest(versions_catalog, major)
+        if latest is None:
+            print(f"No Gradle release found for major version {major}.")
+            sys.exit(1)
+
+        print(latest)
+        if verbose:
+            entry = catalog.get_entry(versions_catalog, latest)
+            print(f"Download: {entry['download_url']}")
+            print(f"Checksum: {entry['checksum_url']}")
+
     elif args.use:
         if not script.is_running_as_privileged_user():
             print(
@@ -208,11 +456,43 @@ def main():
             sys.exit(1)
 
         try:
+            # Resolve everything that can fail before touching any symlink,
+            # so that a failure never leaves the user half switched
+            dist_dir = find_gradle_version_dir(args.use, save=not args.dry_run)
+            selected_jdk = select_java_home(args.use) if args.jdk else None
+
             switch_gradle_version(
                 args.use,
+                dist_dir,
                 dry_run=args.dry_run,
                 verbose=verbose)
+            java_home = None
+            if selected_jdk:
+                java_home = switch_java_home(
+                    selected_jdk,
+                    dry_run=args.dry_run,
+                    verbose=verbose)
+            if args.warm:
+                warm_up_status = warm_up_gradle_version(
+                    args.use,
+                    dist_dir,
+                    jvm_args=args.warm_jvm_args,
+                    java_home=java_home,
+                    dry_run=args.dry_run,
+                    verbose=verbose)
+                if warm_up_status != 0:
+                    sys.exit(warm_up_status)
         except FileNotFoundError as e:
+            print(e)
+            versions_catalog = catalog.load_catalog(
+                offline=args.offline, refresh=args.refresh)
+            if versions_catalog is not None:
+                if catalog.get_entry(versions_catalog, args.use):
+                    print(f"'{args.use}' is a Gradle release, but it is not installed.")
+                else:
+                    print(f"'{args.use}' is not a known Gradle release.")
+            sys.exit(1)
+        except (jdk.NoCompatibleJdkError, warmup.WarmUpError) as e:
             print(e)
             sys.exit(1)
         except Exception as e:
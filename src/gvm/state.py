@@ -0,0 +1,129 @@
+# File:    <repo>/src/gvm/state.py
+# Date:    2024-07-02
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+This `state` sub module of the `gvm` package resolves where gvm keeps its own
+persistent state (inventory, caches, etc.) on disk, and reads and writes the
+JSON state files kept there.
+"""
+
+import os
+import sys
+import json
+import tempfile
+from typing import Optional
+
+
+# Environment variable that overrides the default state directory
+GVM_HOME_ENV_VAR = "GVM_HOME"
+
+
+def get_state_dir() -> str:
+    """
+    Get the directory where gvm keeps its persistent state.
+
+    Defaults to `~/.gvm`, unless overridden by the `GVM_HOME` environment
+    variable. The directory is created if it does not exist yet.
+
+    Returns:
+        str: The absolute path of the state directory.
+    """
+    state_dir = os.environ.get(GVM_HOME_ENV_VAR) or os.path.join(
+        os.path.expanduser("~"), ".gvm")
+    os.makedirs(state_dir, exist_ok=True)
+    return os.path.abspath(state_dir)
+
+
+def get_state_file(name: str) -> str:
+    """
+    Get the absolute path of a named file inside the state directory.
+
+    Args:
+        name (str): The file name, relative to the state directory.
+
+    Returns:
+        str: The absolute path of the state file.
+    """
+    return os.path.join(get_state_dir(), name)
+
+
+def load_json(path: str, expected_format: int) -> Optional[dict]:
+    """
+    Load a JSON state file, if it has the expected format version.
+
+    Args:
+        path (str): The state file.
+        expected_format (int): The required value of the file's `format` key.
+
+    Returns:
+        dict: The file content.
+        None: If the file is missing, unreadable or of another format version.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+        if isinstance(content, dict) and content.get("format") == expected_format:
+            return content
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable state file '{path}': {e}", file=sys.stderr)
+    return None
+
+
+def save_json(
+        path: str,
+        content: dict,
+        indent: Optional[int] = None,
+        only_if_changed: bool = False) -> None:
+    """
+    Save a JSON state file atomically.
+
+    The content is written to a temporary file next to `path`, which then
+    replaces it, so readers never see a partially written file. Errors are
+    reported on stderr and otherwise ignored, as state files are only caches.
+
+    Args:
+        path (str): The state file.
+        content (dict): The JSON serializable content.
+        indent (int, optional): Pretty print with this indentation.
+        only_if_changed (bool, optional): Skip the write if the file already
+            holds the same content.
+    """
+    text = json.dumps(content, indent=indent, sort_keys=indent is not None)
+    if only_if_changed:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if f.read() == text:
+                    return
+        except OSError:
+            pass
+
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path) or ".",
+            prefix=f".{os.path.basename(path)}.",
+            suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        tmp_path = None
+    except OSError as e:
+        print(f"Could not save state file '{path}': {e}", file=sys.stderr)
+    finally:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+__all__ = [
+    get_state_dir,
+    get_state_file,
+    load_json,
+    save_json,
+]
@@ -0,0 +1,94 @@
+# File:    <repo>/src/gvm/version.py
+# Date:    2024-07-02
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+This `version` sub module of the `gvm` package contains helpers for parsing and
+ordering Gradle version strings, e.g. `8.7`, `8.10.2`, `8.8-rc-1`,
+`7.0-milestone-3` or nightly `8.9-20240601001503+0000`.
+"""
+
+import re
+from typing import Optional
+
+
+# Matches a Gradle version string, without anchors, so it can be embedded
+VERSION_PATTERN = r"\d+(?:\.\d+)+(?:-(?:rc|milestone)-\d+|-\d{14}[+-]\d{4})?"
+
+_VERSION_RE = re.compile(
+    r"^(?P<numbers>\d+(?:\.\d+)+)"
+    r"(?:-(?P<stage>rc|milestone)-(?P<stage_number>\d+)"
+    r"|-(?P<timestamp>\d{14})[+-]\d{4})?$")
+
+# Relative order of pre-release stages, a final release sorts last
+_STAGE_RANKS = {
+    "nightly": 0,
+    "milestone": 1,
+    "rc": 2,
+    None: 3,
+}
+
+
+def is_version(version: str) -> bool:
+    """Returns True if the string looks like a Gradle version."""
+    return bool(_VERSION_RE.match(version))
+
+
+def is_release(version: str) -> bool:
+    """Returns True if the version is a final release (no rc, milestone, nightly)."""
+    match = _VERSION_RE.match(version)
+    return bool(match) and not (match.group("stage") or match.group("timestamp"))
+
+
+def get_major(version: str) -> Optional[int]:
+    """
+    Get the major component of a Gradle version.
+
+    Args:
+        version (str): The Gradle version string.
+
+    Returns:
+        int: The major version number.
+        None: If the string is not a Gradle version.
+    """
+    match = _VERSION_RE.match(version)
+    if not match:
+        return None
+    return int(match.group("numbers").split(".")[0])
+
+
+def version_key(version: str) -> tuple:
+    """
+    Get a sort key for a Gradle version, so that e.g. `8.8-rc-1` < `8.8` < `8.10`.
+
+    Strings that are not Gradle versions sort before all valid versions.
+
+    Args:
+        version (str): The Gradle version string.
+
+    Returns:
+        tuple: A key suitable for `sorted(..., key=version_key)`.
+    """
+    match = _VERSION_RE.match(version)
+    if not match:
+        return ((), -1, 0, version)
+
+    numbers = [int(part) for part in match.group("numbers").split(".")]
+    numbers += [0] * (3 - len(numbers))
+
+    if match.group("timestamp"):
+        stage, stage_number = "nightly", int(match.group("timestamp"))
+    else:
+        stage, stage_number = match.group("stage"), int(
+            match.group("stage_number") or 0)
+
+    return (tuple(numbers), _STAGE_RANKS[stage], stage_number, version)
+
+
+__all__ = [
+    is_version,
+    is_release,
+    get_major,
+    version_key,
+]
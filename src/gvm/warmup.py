@@ -0,0 +1,219 @@
+# File:    <repo>/src/gvm/warmup.py
+# Date:    2024-07-06
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+This `warmup` sub module of the `gvm` package prepares a freshly selected
+Gradle distribution, so that the first real build after a switch does not pay
+for a cold JVM, a cold daemon and a cold page cache.
+
+It does so by:
+- Prefetching the distribution's jars into the OS page cache.
+- Starting a detached Gradle daemon, by running a trivial build (`help`) in an
+  empty throw-away project. The daemon stays alive after the build finishes.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+from typing import Optional
+
+from reflect import runtime_os, user
+
+
+DEFAULT_WARM_TIMEOUT = 180  # seconds
+
+# Chunk size for reading files into the page cache, where fadvise is unavailable
+PREFETCH_CHUNK_SIZE = 1024 * 1024
+
+
+class WarmUpError(RuntimeError):
+    """Raised when the Gradle daemon for the warm-up could not be started."""
+
+
+def prefetch_file(path: str) -> int:
+    """
+    Ask the OS to load a file into the page cache.
+
+    Uses `posix_fadvise(POSIX_FADV_WILLNEED)`, which starts asynchronous
+    readahead of the whole file, where available. Otherwise the file is simply
+    read and discarded.
+
+    Args:
+        path (str): The file to prefetch.
+
+    Returns:
+        int: The size of the file in bytes, or 0 if it could not be read.
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            else:
+                while f.read(PREFETCH_CHUNK_SIZE):
+                    pass
+            return size
+    except OSError as e:
+        print(f"Could not prefetch '{path}': {e}", file=sys.stderr)
+        return 0
+
+
+def prefetch_distribution(dist_dir: str) -> tuple[int, int]:
+    """
+    Prefetch all the jars of a distribution's `lib` directory tree.
+
+    Args:
+        dist_dir (str): The distribution (pseudo GRADLE_HOME) directory.
+
+    Returns:
+        tuple: The number of jars, and their total size in bytes.
+    """
+    count, total = 0, 0
+    for dir_path, _, file_names in os.walk(os.path.join(dist_dir, "lib")):
+        for file_name in file_names:
+            if file_name.endswith(".jar"):
+                total += prefetch_file(os.path.join(dir_path, file_name))
+                count += 1
+    return count, total
+
+
+def get_gradle_launcher(dist_dir: str) -> str:
+    """Get the path of the distribution's `gradle` launcher for this OS."""
+    name = "gradle.bat" if runtime_os.is_windows_compatible() else "gradle"
+    return os.path.join(dist_dir, "bin", name)
+
+
+def start_daemon(
+        dist_dir: str,
+        jvm_args: Optional[str] = None,
+        java_home: Optional[str] = None) -> tuple[subprocess.Popen, str]:
+    """
+    Start a detached Gradle daemon for a distribution.
+
+    Args:
+        dist_dir (str): The distribution (pseudo GRADLE_HOME) directory.
+        jvm_args (str, optional): JVM arguments for the daemon, as passed to
+            `org.gradle.jvmargs`. Defaults to Gradle's own defaults.
+        java_home (str, optional): The JDK to run the daemon on.
+            Defaults to the environment's `JAVA_HOME`.
+
+    Returns:
+        tuple: The Gradle client process, and the throw-away project directory
+            it builds, which the caller must remove once the client exits.
+
+    Raises:
+        WarmUpError: If the Gradle launcher could not be started.
+    """
+    command = [get_gradle_launcher(dist_dir), "--daemon", "--quiet"]
+    if jvm_args:
+        command.append(f"-Dorg.gradle.jvmargs={jvm_args}")
+
+    env = dict(os.environ)
+    if java_home:
+        env["JAVA_HOME"] = java_home
+
+    options = {}
+    if runtime_os.is_windows_compatible():
+        options["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options["start_new_session"] = True
+
+    try:
+        project_dir = tempfile.mkdtemp(prefix="gvm-warm-")
+    except OSError as e:
+        raise WarmUpError(f"Could not create the warm-up project: {e}") from e
+
+    try:
+        with open(os.path.join(project_dir, "settings.gradle"), "w") as f:
+            f.write("rootProject.name = 'gvm-warm'\n")
+
+        # not as (and for) root, when invoked through sudo
+        invoking_user = user.get_invoking_user_ids() \
+            if runtime_os.is_posix_compatible() else None
+        if invoking_user:
+            uid, gid = invoking_user
+            os.chown(project_dir, uid, gid)
+            env["HOME"] = user.get_home_dir(uid) or env.get("HOME", "")
+            env["USER"] = env["LOGNAME"] = user.get_username(uid) or ""
+            options["user"], options["group"] = uid, gid
+
+        process = subprocess.Popen(
+            command + ["--project-dir", project_dir, "help"],
+            cwd=project_dir,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **options)
+    except OSError as e:
+        shutil.rmtree(project_dir, ignore_errors=True)
+        raise WarmUpError(f"Could not start '{command[0]}': {e}") from e
+    return process, project_dir
+
+
+def warm_up(
+        dist_dir: str,
+        jvm_args: Optional[str] = None,
+        java_home: Optional[str] = None,
+        timeout: float = DEFAULT_WARM_TIMEOUT) -> dict:
+    """
+    Prefetch a distribution's jars and start a daemon for it.
+
+    Waits for the daemon's first build to finish (up to `timeout`), so that the
+    reported time covers the whole warm-up. If the timeout passes, the Gradle
+    client is stopped (the daemon, a separate process, is left alone) so that
+    the throw-away project can be removed in all cases.
+
+    Where `posix_fadvise` is available, the prefetch only asks the kernel to
+    read ahead, and returns before the jars are actually cached. Its time is
+    therefore reported as `prefetch_request_seconds`, not as prefetch time.
+
+    Args:
+        dist_dir (str): The distribution (pseudo GRADLE_HOME) directory.
+        jvm_args (str, optional): See `start_daemon`.
+        java_home (str, optional): See `start_daemon`.
+        timeout (float, optional): Seconds to wait for the daemon's first build.
+
+    Returns:
+        dict: With keys `jars`, `bytes`, `prefetch_request_seconds`,
+            `daemon_seconds`, `total_seconds` and `daemon_status` (the client's
+            exit code, or None if it was stopped when the timeout passed).
+    """
+    started = time.perf_counter()
+    jars, total = prefetch_distribution(dist_dir)
+    prefetched = time.perf_counter()
+
+    process, project_dir = start_daemon(dist_dir, jvm_args, java_home)
+    try:
+        status = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        status = None
+        process.kill()
+        process.wait()
+    finally:
+        finished = time.perf_counter()
+        shutil.rmtree(project_dir, ignore_errors=True)
+
+    return {
+        "jars": jars,
+        "bytes": total,
+        "prefetch_request_seconds": prefetched - started,
+        "daemon_seconds": finished - prefetched,
+        "total_seconds": finished - started,
+        "daemon_status": status,
+    }
+
+
+__all__ = [
+    prefetch_file,
+    prefetch_distribution,
+    get_gradle_launcher,
+    WarmUpError,
+    start_daemon,
+    warm_up,
+]
@@ -45,6 +45,29 @@ def is_privileged() -> bool:
     raise NotImplementedError("Not yet implemented.")
 
 
+def is_running_as_privileged_user() -> bool:
+    """
+    Check if the script is running as a privileged user.
+
+    - On POSIX systems, the effective user must be root (UID 0), e.g. when
+    invoked through `sudo`.
+
+    - On Windows systems, the process must hold an elevated administrative
+    token, e.g. when started through "Run as administrator".
+
+    Returns:
+        - `True` if the script runs as a privileged user,
+        - `False` otherwise.
+    """
+    if os.name == "nt":
+        import ctypes
+        try:
+            return bool(ctypes.windll.shell32.IsUserAnAdmin())
+        except (AttributeError, OSError):
+            return False
+    return os.geteuid() == 0
+
+
 def get_owner(script_path):
     """Return the username of the owner of the script file."""
     return pwd.getpwuid(os.stat(script_path).st_uid).pw_name
@@ -54,5 +77,6 @@ __all__ = [
     is_invoked,
     is_imported,
     is_privileged,
+    is_running_as_privileged_user,
     get_owner,
 ]
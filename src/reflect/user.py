@@ -39,6 +39,27 @@ def get_uid(username=None):
     return found_uid
 
 
+def get_uids():
+    """
+    Get the User IDs of all users known to the system (the password database).
+
+    Returns:
+        list: The user IDs, without duplicates, in database order.
+            Empty if the password database could not be read.
+    """
+    found_uids = []
+    seen_uids = set()
+    try:
+        for entry in pwd.getpwall():
+            if entry.pw_uid not in seen_uids:
+                seen_uids.add(entry.pw_uid)
+                found_uids.append(entry.pw_uid)
+    except BaseException as e:
+        print("Could not read the password database", file=sys.stderr)
+        print(e, file=sys.stderr)
+    return found_uids
+
+
 def get_username(uid=None):
     """
     Get the specified user's username. Defaults to the current user.
@@ -93,6 +114,38 @@ def get_home_dir(uid=None):
     return found_home_dir
 
 
+def get_invoking_user_ids():
+    """
+    Get the User and Group IDs of the user that invoked the script through
+    `sudo`, i.e. the user the privileged process is acting on behalf of.
+
+    Returns:
+        tuple: The (uid, gid) of the invoking user.
+        None: If the script is not running privileged through `sudo`.
+    """
+    if not is_privileged():
+        return None
+    try:
+        return int(os.environ["SUDO_UID"]), int(os.environ["SUDO_GID"])
+    except (KeyError, ValueError):
+        return None
+
+
+def get_invoking_user_home_dir():
+    """
+    Get the home directory of the user the script acts on behalf of: the user
+    that invoked it through `sudo` if any, otherwise the current user.
+
+    Returns:
+        str: The home directory of the user.
+        None: If the home directory could not be resolved.
+    """
+    invoking_user = get_invoking_user_ids()
+    if invoking_user:
+        return get_home_dir(invoking_user[0])
+    return os.path.expanduser("~")
+
+
 def is_privileged(uid=None):
     """
     Checks if the specified user is privileged.
@@ -118,7 +171,10 @@ def is_privileged(uid=None):
 
 __all__ = [
     get_uid,
+    get_uids,
     get_username,
     get_home_dir,
+    get_invoking_user_ids,
+    get_invoking_user_home_dir,
     is_privileged,
 ]
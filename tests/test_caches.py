@@ -0,0 +1,135 @@
+# File:    <repo>/tests/test_caches.py
+# Date:    2024-07-07
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+Tests for the `caches` sub module of the `gvm` package, against a throw-away
+Gradle user home. Locks are held by a child process, as Gradle would.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+from gvm import caches
+
+
+# Holds an exclusive lock on argv[1] until its stdin is closed
+LOCK_HOLDER = """
+import fcntl, sys
+with open(sys.argv[1], "r+b") as f:
+    fcntl.lockf(f.fileno(), fcntl.LOCK_EX)
+    print("locked", flush=True)
+    sys.stdin.read()
+"""
+
+
+@unittest.skipUnless(os.name == "posix", "Gradle style file locks are POSIX only here")
+class CachesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.gradle_user_home = tempfile.mkdtemp(prefix="gvm-test-")
+        self.lock_holders = []
+
+        for rel_path in [
+                "caches/8.7/kotlin-dsl/accessors.bin",
+                "caches/7.6.4/file-hashes/fileHashes.lock",
+                "caches/6.9/generated-gradle-jars/gradle-api.jar",
+                "daemon/7.6.4/daemon-1.out.log",
+                "daemon/6.9/registry.bin.lock",
+                "caches/modules-2/files-2.1/junit.jar",
+                "caches/jars-9/some.jar",
+                "daemon/notes/readme.txt"]:
+            self.write_file(rel_path, 1000)
+
+    def tearDown(self):
+        for process in self.lock_holders:
+            process.stdin.close()
+            process.wait()
+        shutil.rmtree(self.gradle_user_home, ignore_errors=True)
+
+    def path(self, rel_path: str) -> str:
+        return os.path.join(self.gradle_user_home, *rel_path.split("/"))
+
+    def write_file(self, rel_path: str, size: int) -> None:
+        path = self.path(rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+
+    def hold_lock(self, rel_path: str) -> None:
+        process = subprocess.Popen(
+            [sys.executable, "-c", LOCK_HOLDER, self.path(rel_path)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.lock_holders.append(process)
+        self.assertEqual(process.stdout.readline().strip(), "locked")
+
+    def analyze(self) -> list[dict]:
+        return caches.analyze_caches({"8.7"}, self.gradle_user_home, max_workers=2)
+
+    def test_analyze_flags_orphans_and_ignores_non_version_dirs(self):
+        records = self.analyze()
+
+        self.assertEqual(
+            [(r["version"], r["subtree"], r["orphan"], r["locked"]) for r in records],
+            [("6.9", "caches", True, False),
+             ("6.9", "daemon", True, False),
+             ("7.6.4", "caches", True, False),
+             ("7.6.4", "daemon", True, False),
+             ("8.7", "caches", False, False)])
+        self.assertTrue(all(r["bytes"] == 1000 for r in records))
+
+    def test_is_file_locked(self):
+        lock_file = self.path("caches/7.6.4/file-hashes/fileHashes.lock")
+        self.assertFalse(caches.is_file_locked(lock_file))
+        self.assertFalse(caches.is_file_locked(self.path("no/such.lock")))
+
+        self.hold_lock("caches/7.6.4/file-hashes/fileHashes.lock")
+        self.assertTrue(caches.is_file_locked(lock_file))
+        self.assertTrue(caches.is_dir_locked(self.path("caches/7.6.4")))
+        self.assertFalse(caches.is_dir_locked(self.path("caches/6.9")))
+
+        self.lock_holders.pop().stdin.close()
+        self.assertFalse(caches.is_file_locked(lock_file))
+
+    def test_prune_dry_run_removes_nothing(self):
+        orphans = [r for r in self.analyze() if r["orphan"]]
+
+        removed, freed = caches.prune_orphans(orphans, dry_run=True)
+
+        self.assertEqual((removed, freed), (4, 4000))
+        self.assertTrue(all(os.path.isdir(r["path"]) for r in orphans))
+
+    def test_prune_skips_every_subtree_of_a_locked_version(self):
+        self.hold_lock("caches/7.6.4/file-hashes/fileHashes.lock")
+        records = self.analyze()
+        self.assertTrue(all(r["locked"] for r in records if r["version"] == "7.6.4"))
+
+        removed, freed = caches.prune_orphans([r for r in records if r["orphan"]])
+
+        self.assertEqual((removed, freed), (2, 2000))
+        self.assertFalse(os.path.exists(self.path("caches/6.9")))
+        self.assertFalse(os.path.exists(self.path("daemon/6.9")))
+        self.assertTrue(os.path.isdir(self.path("caches/7.6.4")))
+        self.assertTrue(os.path.isdir(self.path("daemon/7.6.4")))
+        self.assertTrue(os.path.isdir(self.path("caches/8.7")))
+        self.assertTrue(os.path.isdir(self.path("caches/modules-2")))
+
+    def test_prune_rechecks_locks_taken_after_the_analysis(self):
+        records = self.analyze()
+        self.hold_lock("daemon/6.9/registry.bin.lock")
+
+        removed, _ = caches.prune_orphans([r for r in records if r["orphan"]])
+
+        self.assertEqual(removed, 2)
+        self.assertTrue(os.path.isdir(self.path("caches/6.9")))
+        self.assertTrue(os.path.isdir(self.path("daemon/6.9")))
+        self.assertFalse(os.path.exists(self.path("caches/7.6.4")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+# File:    <repo>/tests/test_catalog.py
+# Date:    2024-07-03
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+Tests for the `catalog` sub module of the `gvm` package, against a local
+`http.server` stand-in for services.gradle.org.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from gvm import catalog
+
+
+VERSIONS_JSON = [
+    {"version": "8.11-rc-1", "rcFor": "8.11", "activeRc": True},
+    {"version": "8.10.2", "current": True,
+     "downloadUrl": "https://example.invalid/gradle-8.10.2-bin.zip",
+     "checksumUrl": "https://example.invalid/gradle-8.10.2-bin.zip.sha256"},
+    {"version": "8.9"},
+    {"version": "8.9-20240601001503+0000", "nightly": True},
+    {"version": "7.6.4"},
+    {"version": "7.6.3", "broken": True},
+]
+
+ETAG = '"versions-v1"'
+
+
+class VersionsHandler(BaseHTTPRequestHandler):
+    """
+    Serves `VERSIONS_JSON`, honouring `If-None-Match`, and records requests.
+    When the server is marked `broken`, it answers with a garbage status line,
+    like a misbehaving proxy would.
+    """
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.server.broken:
+            self.wfile.write(b"garbage\r\n\r\n")
+            return
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = json.dumps(VERSIONS_JSON).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", "Mon, 01 Jul 2024 00:00:00 GMT")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), VersionsHandler)
+        self.server.requests = []
+        self.server.broken = False
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/versions/all"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.state_dir = tempfile.mkdtemp(prefix="gvm-test-")
+        self.cache_path = os.path.join(self.state_dir, catalog.CATALOG_FILE_NAME)
+
+    def tearDown(self):
+        self.stop_server()
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def stop_server(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def load(self, **kwargs):
+        return catalog.load_catalog(url=self.url, path=self.cache_path, **kwargs)
+
+    def test_first_fetch_builds_and_stores_index(self):
+        result = self.load(ttl=3600)
+
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(result["etag"], ETAG)
+        self.assertEqual(catalog.get_latest(result), "8.10.2")
+        self.assertEqual(catalog.get_latest(result, 7), "7.6.4")
+        self.assertTrue(catalog.get_entry(result, "8.11-rc-1")["rc"])
+        self.assertTrue(catalog.get_entry(result, "8.9-20240601001503+0000")["nightly"])
+        self.assertEqual(
+            catalog.get_entry(result, "8.10.2")["checksum_url"],
+            "https://example.invalid/gradle-8.10.2-bin.zip.sha256")
+        self.assertEqual(result["index"]["current"], "8.10.2")
+        self.assertTrue(os.path.isfile(self.cache_path))
+
+    def test_fresh_cache_is_used_without_requests(self):
+        self.load(ttl=3600)
+        result = self.load(ttl=3600)
+
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(catalog.get_latest(result), "8.10.2")
+
+    def test_expired_cache_is_revalidated_conditionally(self):
+        first = self.load(ttl=3600)
+        result = self.load(ttl=0)
+
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[1].get("If-None-Match"), ETAG)
+        self.assertEqual(
+            self.server.requests[1].get("If-Modified-Since"),
+            "Mon, 01 Jul 2024 00:00:00 GMT")
+        self.assertEqual(result["index"], first["index"])
+        self.assertGreaterEqual(result["fetched_at"], first["fetched_at"])
+
+    def test_refresh_revalidates_before_ttl(self):
+        self.load(ttl=3600)
+        self.load(ttl=3600, refresh=True)
+
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_offline_never_requests(self):
+        self.assertIsNone(self.load(offline=True))
+        self.load(ttl=3600)
+        result = self.load(ttl=0, offline=True)
+
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(catalog.get_latest(result), "8.10.2")
+
+    def test_unreachable_server_falls_back_to_cache(self):
+        self.load(ttl=3600)
+        self.stop_server()
+
+        result = self.load(ttl=0)
+        self.assertIsNotNone(result)
+        self.assertEqual(catalog.get_latest(result, 8), "8.10.2")
+
+    def test_malformed_response_falls_back_to_cache(self):
+        self.load(ttl=3600)
+        self.server.broken = True
+
+        result = self.load(ttl=0)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertIsNotNone(result)
+        self.assertEqual(catalog.get_latest(result), "8.10.2")
+
+    def test_malformed_response_without_cache(self):
+        self.server.broken = True
+
+        self.assertIsNone(self.load(ttl=0))
+
+    def test_unreachable_server_without_cache(self):
+        self.stop_server()
+
+        self.assertIsNone(self.load(ttl=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
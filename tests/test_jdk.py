@@ -0,0 +1,100 @@
+# File:    <repo>/tests/test_jdk.py
+# Date:    2024-07-05
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+Tests for the `jdk` sub module of the `gvm` package: the Gradle / Java
+compatibility table, and picking a JDK from it.
+"""
+
+import unittest
+
+from gvm import jdk, version as gradle_version
+
+
+def make_jdk(java_version: str) -> dict:
+    return {
+        "home": f"/opt/jdk-{java_version}",
+        "version": java_version,
+        "feature": jdk.get_feature_version(java_version),
+        "vendor": "Test",
+    }
+
+
+class CompatibilityTableTest(unittest.TestCase):
+
+    def test_java_versions_are_consecutive(self):
+        java_versions = [java for java, _ in jdk.GRADLE_JDK_COMPATIBILITY]
+        self.assertEqual(
+            java_versions,
+            list(range(java_versions[0], java_versions[-1] + 1)))
+
+    def test_gradle_versions_are_ascending(self):
+        for table in (
+                [since for _, since in jdk.GRADLE_JDK_COMPATIBILITY],
+                [since for since, _ in jdk.GRADLE_MIN_JDK]):
+            keys = [gradle_version.version_key(v) for v in table]
+            self.assertEqual(keys, sorted(keys))
+            self.assertTrue(all(gradle_version.is_version(v) for v in table))
+
+    def test_minimum_java_versions_are_ascending(self):
+        minimums = [java for _, java in jdk.GRADLE_MIN_JDK]
+        self.assertEqual(minimums, sorted(minimums))
+
+
+class SupportedJavaRangeTest(unittest.TestCase):
+
+    def test_releases(self):
+        self.assertEqual(jdk.get_supported_java_range("4.10.3"), (7, 10))
+        self.assertEqual(jdk.get_supported_java_range("7.6.4"), (8, 19))
+        self.assertEqual(jdk.get_supported_java_range("8.4"), (8, 20))
+        self.assertEqual(jdk.get_supported_java_range("8.10.2"), (8, 23))
+
+    def test_minimum_boundaries(self):
+        self.assertEqual(jdk.get_supported_java_range("4.10")[0], 7)
+        self.assertEqual(jdk.get_supported_java_range("5.0")[0], 8)
+        self.assertEqual(jdk.get_supported_java_range("8.14")[0], 8)
+        self.assertEqual(jdk.get_supported_java_range("9.0.0")[0], 17)
+
+    def test_maximum_boundaries(self):
+        self.assertEqual(jdk.get_supported_java_range("8.7")[1], 21)
+        self.assertEqual(jdk.get_supported_java_range("8.8")[1], 22)
+        self.assertEqual(jdk.get_supported_java_range("9.0.0")[1], 24)
+        self.assertEqual(jdk.get_supported_java_range("9.1.0")[1], 25)
+
+    def test_pre_releases_support_the_new_java_version(self):
+        self.assertEqual(jdk.get_supported_java_range("8.8-rc-1"), (8, 22))
+        self.assertEqual(jdk.get_supported_java_range("8.8-milestone-2"), (8, 22))
+        self.assertEqual(jdk.get_supported_java_range("9.1.0-rc-1"), (17, 25))
+
+    def test_pre_releases_need_the_new_minimum_java_version(self):
+        self.assertEqual(jdk.get_supported_java_range("8.14.3")[0], 8)
+        self.assertEqual(jdk.get_supported_java_range("9.0.0-rc-1")[0], 17)
+        self.assertEqual(jdk.get_supported_java_range("9.0-milestone-1")[0], 17)
+
+
+class SelectJdkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.jdks = [make_jdk(v) for v in ("1.8.0_402", "11.0.22", "17.0.11", "21.0.3")]
+
+    def test_picks_the_newest_compatible_jdk(self):
+        self.assertEqual(jdk.select_jdk("8.10.2", self.jdks)["version"], "21.0.3")
+        self.assertEqual(jdk.select_jdk("7.6.4", self.jdks)["version"], "17.0.11")
+        self.assertEqual(jdk.select_jdk("5.6.4", self.jdks)["version"], "11.0.22")
+        self.assertEqual(jdk.select_jdk("4.10.3", self.jdks)["version"], "1.8.0_402")
+
+    def test_none_compatible(self):
+        self.assertIsNone(jdk.select_jdk("9.1.0", [make_jdk("11.0.22")]))
+        self.assertIsNone(jdk.select_jdk("8.10.2", []))
+
+    def test_feature_versions(self):
+        self.assertEqual(jdk.get_feature_version("1.8.0_402"), 8)
+        self.assertEqual(jdk.get_feature_version("11.0.22"), 11)
+        self.assertEqual(jdk.get_feature_version("21"), 21)
+        self.assertIsNone(jdk.get_feature_version("unknown"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# File:    <repo>/tests/test_state.py
+# Date:    2024-07-05
+# License: MIT License
+# Author:  Carl J du Preez <carljdp@gmail.com>
+
+"""
+Tests for the JSON state file helpers of the `state` sub module of the `gvm`
+package.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from gvm import state
+
+
+class JsonStateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp(prefix="gvm-test-")
+        self.path = os.path.join(self.state_dir, "state.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def test_round_trip_leaves_no_temporary_files(self):
+        state.save_json(self.path, {"format": 1, "items": [1, 2]})
+
+        self.assertEqual(state.load_json(self.path, 1), {"format": 1, "items": [1, 2]})
+        self.assertEqual(os.listdir(self.state_dir), ["state.json"])
+
+    def test_other_format_is_ignored(self):
+        state.save_json(self.path, {"format": 2})
+
+        self.assertIsNone(state.load_json(self.path, 1))
+
+    def test_missing_and_corrupt_files_are_ignored(self):
+        self.assertIsNone(state.load_json(self.path, 1))
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.assertIsNone(state.load_json(self.path, 1))
+
+    def test_unchanged_content_is_not_rewritten(self):
+        state.save_json(self.path, {"format": 1}, indent=2)
+        os.utime(self.path, ns=(0, 0))
+
+        state.save_json(self.path, {"format": 1}, indent=2, only_if_changed=True)
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+
+        state.save_json(self.path, {"format": 1, "x": 1}, indent=2, only_if_changed=True)
+        self.assertNotEqual(os.stat(self.path).st_mtime_ns, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()